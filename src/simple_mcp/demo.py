@@ -13,18 +13,36 @@ Usage:
     python demo.py
 """
 
+from __future__ import annotations
+
 import asyncio
+import hashlib
 import json
 import os
+import pickle
+import re
 import sys
+from collections import OrderedDict, deque
 from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Sequence, cast, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Sequence, Any
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to stdlib json
+
+# Hot-path parser; both accept str or bytes and raise ValueError subclasses
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+if TYPE_CHECKING:
+    from agents import Agent
+    from agents.mcp import MCPServer, MCPServerStdio
+    from agents.mcp.server import MCPServerStdioParams
 
 # 🚀 CONFIGURATION FLAGS - Change these to switch between different models
 USE_NOVA = True    # Set to True to use Amazon Nova Lite via AWS Bedrock
@@ -32,83 +50,202 @@ USE_GEMINI = False # Set to True to use Google's Gemini Pro
 USE_CLAUDE = False # Set to True to use Anthropic's Claude
 USE_OPENAI = False # Set to True to use OpenAI's GPT-4o-mini
 
-# Ensure only one model is enabled
-if sum([USE_NOVA, USE_GEMINI, USE_CLAUDE]) > 1:
-    print("❌ Error: Please enable only one model at a time!")
-    sys.exit(1)
-elif sum([USE_NOVA, USE_GEMINI, USE_CLAUDE]) == 0:
-    print("❌ Error: Please enable at least one model!")
-    sys.exit(1)
-
-# Import model integrations based on flags
-if USE_NOVA:
-    from simple_mcp.nova_integration import validate_nova_setup
-    print("🔄 Nova mode enabled - validating AWS setup...")
-    nova_valid, nova_integration = validate_nova_setup()
-    if not nova_valid:
-        print("❌ Nova setup failed. Please check your AWS credentials in .env file.")
-        print("Required variables: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION_NAME")
-        sys.exit(1)
-    model_integration = nova_integration
-elif USE_GEMINI:
-    from simple_mcp.gemini_integration import validate_gemini_setup
-    print("🔄 Gemini mode enabled - validating Google API setup...")
-    gemini_valid, gemini_integration = validate_gemini_setup()
-    if not gemini_valid:
-        print("❌ Gemini setup failed. Please check your Google API key in .env file.")
-        print("Required variables: GOOGLE_API_KEY")
-        sys.exit(1)
-    model_integration = gemini_integration
-elif USE_CLAUDE:
-    from simple_mcp.claude_integration import validate_claude_setup
-    print("🔄 Claude mode enabled - validating Anthropic setup...")
-    claude_valid, claude_integration = validate_claude_setup()
-    if not claude_valid:
-        print("❌ Claude setup failed. Please check your Anthropic API key in .env file.")
-        print("Required variables: ANTHROPIC_API_KEY")
-        sys.exit(1)
-    model_integration = claude_integration
-elif USE_OPENAI:
-    from simple_mcp.openai_integration import validate_openai_setup
-    print("🔄 OpenAI mode enabled - validating OpenAI setup...")
-    openai_valid, openai_integration = validate_openai_setup()
-    if not openai_valid:
-        print("❌ OpenAI setup failed. Please check your OpenAI API key in .env file.")
-        print("Required variables: OPENAI_API_KEY")
-        sys.exit(1)
-    model_integration = openai_integration
-else:
+# Opt-in: replay identical (model, instructions, history, input) turns from
+# an in-memory cache. Off by default -- tool-backed answers can be
+# non-deterministic (time, filesystem state), so only enable during dev.
+USE_RESPONSE_CACHE = False
+
+from simple_mcp.prompts import get_prompt  # Changed to absolute import
+
+# Static UI text, built once at import instead of per call
+_PROVIDER_STATUS = "🚀 Amazon Nova (AWS Bedrock)" if USE_NOVA else "🤖 OpenAI"
+
+_HELP_TEXT = f"""
+🤖 **Available Commands:**
+• `/help` - Show this help message
+• `/clear` - Clear conversation history
+• `/history` - Show recent conversation history
+• `/save` - Save conversation to file
+• `/debug` - Save debug information (tool calls, usage) to file
+• `/tools` - List available MCP tools
+• `/quit` or `/exit` - Exit the chat
+• Any other message - Chat with the assistant
+
+**Current Provider:** {_PROVIDER_STATUS}
+**💡 Tip:** Change USE_NOVA flag in demo.py to switch providers
+""".strip()
+
+_WELCOME_TEMPLATE = """🚀 AI Agent with MCP Tools - Interactive Chat
+{rule}
+📂 Config: {config}
+🔗 MCP Servers: {n_servers} loaded
+🧠 Memory: {max_history} exchanges
+{provider} | Model: {model}
+
+💡 Type '/help' for commands or just start chatting!
+🎯 Example: 'List files in current directory' or 'What's the current time?'
+{dash_rule}"""
+
+
+def validate_model_setup():
+    """Validate the enabled model's credentials and return its integration.
+
+    Runs from main() rather than at import time, so importing this module
+    (e.g. from tests or other scripts) has no side effects and env vars can
+    be set up by the caller first. Returns None when validation fails.
+    """
+    # Ensure only one model is enabled
+    if sum([USE_NOVA, USE_GEMINI, USE_CLAUDE]) > 1:
+        print("❌ Error: Please enable only one model at a time!")
+        return None
+    elif sum([USE_NOVA, USE_GEMINI, USE_CLAUDE]) == 0:
+        print("❌ Error: Please enable at least one model!")
+        return None
+
+    # Import model integrations based on flags
+    if USE_NOVA:
+        from simple_mcp.nova_integration import validate_nova_setup
+        print("🔄 Nova mode enabled - validating AWS setup...")
+        nova_valid, nova_integration = validate_nova_setup()
+        if not nova_valid:
+            print("❌ Nova setup failed. Please check your AWS credentials in .env file.")
+            print("Required variables: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION_NAME")
+            return None
+        return nova_integration
+    elif USE_GEMINI:
+        from simple_mcp.gemini_integration import validate_gemini_setup
+        print("🔄 Gemini mode enabled - validating Google API setup...")
+        gemini_valid, gemini_integration = validate_gemini_setup()
+        if not gemini_valid:
+            print("❌ Gemini setup failed. Please check your Google API key in .env file.")
+            print("Required variables: GOOGLE_API_KEY")
+            return None
+        return gemini_integration
+    elif USE_CLAUDE:
+        from simple_mcp.claude_integration import validate_claude_setup
+        print("🔄 Claude mode enabled - validating Anthropic setup...")
+        claude_valid, claude_integration = validate_claude_setup()
+        if not claude_valid:
+            print("❌ Claude setup failed. Please check your Anthropic API key in .env file.")
+            print("Required variables: ANTHROPIC_API_KEY")
+            return None
+        return claude_integration
+    elif USE_OPENAI:
+        from simple_mcp.openai_integration import validate_openai_setup
+        print("🔄 OpenAI mode enabled - validating OpenAI setup...")
+        openai_valid, openai_integration = validate_openai_setup()
+        if not openai_valid:
+            print("❌ OpenAI setup failed. Please check your OpenAI API key in .env file.")
+            print("Required variables: OPENAI_API_KEY")
+            return None
+        return openai_integration
+
     # This case shouldn't be reached due to earlier check
     print("❌ No model selected!")
-    sys.exit(1)
+    return None
 
-from agents import Agent, Runner
-from agents.mcp import MCPServerStdio, MCPServer
-from agents.mcp.server import MCPServerStdioParams
-from simple_mcp.prompts import get_prompt  # Changed to absolute import
+
+@dataclass
+class ServerSpec:
+    """Pre-resolved stdio server parameters from config.json."""
+    command: str
+    args: List[str]
+    env: Dict[str, str] = field(default_factory=dict)
+
+    def to_params(self) -> MCPServerStdioParams:
+        """Build the params dict expected by MCPServerStdio."""
+        params: MCPServerStdioParams = {"command": self.command, "args": self.args}
+        if self.env:
+            params["env"] = self.env
+        return params
+
+
+def _normalize_env(env: Dict[str, str]) -> Dict[str, str]:
+    """Validate and re-escape env values that carry JSON payloads."""
+    normalized: Dict[str, str] = {}
+    for key, value in env.items():
+        # Only OPENAPI_MCP_HEADERS needs the round-trip, and only when the
+        # value actually looks like JSON
+        if key == "OPENAPI_MCP_HEADERS" and isinstance(value, str) and value.startswith(("{", "[")):
+            try:
+                # Parse to ensure validity, re-encode with proper escaping
+                if orjson is not None:
+                    normalized[key] = orjson.dumps(orjson.loads(value)).decode()
+                else:
+                    normalized[key] = json.dumps(json.loads(value))
+            except ValueError:
+                normalized[key] = value
+        else:
+            normalized[key] = value
+    return normalized
+
+
+@dataclass
+class Exchange:
+    """One user/assistant exchange."""
+    user: str
+    assistant: str
+
+
+def _ellipsize(s: str, n: int) -> str:
+    """Truncate s to n characters, appending '...' when shortened."""
+    return s if len(s) <= n else s[:n] + "..."
 
 
 class ChatSession:
     """Manages conversation memory and session state."""
-    
-    def __init__(self, max_history: int = 10):
-        self.history: List[Tuple[str, str]] = []
+
+    # Inputs that don't benefit from injected history: greetings and
+    # sign-offs only. Confirmations like "yes"/"ok" depend on the previous
+    # turn and must keep their context.
+    _TRIVIAL_INPUT_RE = re.compile(r'^(hi|hello|hey|thanks|thank you|bye)\b', re.I)
+
+
+    def __init__(self, max_history: int = 10, char_budget: int = 8000):
+        # Bounded deque: O(1) append with automatic eviction of the oldest
+        self.history: deque = deque(maxlen=max_history)
         self.max_history = max_history
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Cap on total retained characters, so one giant exchange can't
+        # blow the context while ten tiny ones under-use the count cap
+        self.char_budget = char_budget
+        self._size = 0
+        # Capture the start time once; session_id and any session-scoped
+        # timestamps derive from it without re-reading the clock
+        self._started_at = datetime.now()
+        self.session_id = self._started_at.strftime("%Y%m%d_%H%M%S")
         self.debug_history: List[Dict[str, Any]] = []
-    
+        # Records accumulated since the last save; flushed as JSON Lines
+        self._pending_history: List[Dict[str, Any]] = []
+        self._pending_debug: List[Dict[str, Any]] = []
+
     def add_exchange(self, user_message: str, agent_response: str):
         """Add a user-agent exchange to conversation history."""
-        self.history.append((user_message, agent_response))
-        
-        # Keep only recent history to avoid context overflow
-        if len(self.history) > self.max_history:
-            self.history = self.history[-self.max_history:]
+        # Account for the exchange the maxlen deque silently evicts when full
+        if len(self.history) == self.max_history:
+            evicted = self.history[0]
+            self._size -= len(evicted.user) + len(evicted.assistant)
+
+        self.history.append(Exchange(user=user_message, assistant=agent_response))
+        self._size += len(user_message) + len(agent_response)
+
+        # Evict oldest exchanges until the retained text fits the budget
+        while self._size > self.char_budget and len(self.history) > 1:
+            evicted = self.history.popleft()
+            self._size -= len(evicted.user) + len(evicted.assistant)
+
+        self._pending_history.append({
+            'timestamp': datetime.now().isoformat(),
+            'user': user_message,
+            'assistant': agent_response
+        })
     
     def add_debug_info(self, result) -> None:
         """Add debug information from a run result."""
+        # One timestamp per turn: every item of this run shares it, which is
+        # fine at this resolution and avoids a datetime.now() per tool call
+        now_iso = datetime.now().isoformat()
         debug_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso,
             "tool_calls": [],
             "usage": {
                 "input_tokens": result.context_wrapper.usage.input_tokens,
@@ -117,99 +254,144 @@ class ChatSession:
                 "requests": result.context_wrapper.usage.requests
             }
         }
-        
+
         # Track current tool call to match with its output
-        current_tool_call = None
-        
-        # Process each item in the run result
+        state: Dict[str, Any] = {"current": None, "now": now_iso}
+
+        # Process each item in the run result via the type-keyed table
         for item in result.new_items:
-            if not hasattr(item, 'type'):
-                continue
-                
-            if item.type == 'tool_call_item':
-                # Extract tool call information
-                tool_name = 'unknown'
-                arguments = {}
-                
-                if hasattr(item.raw_item, 'function'):
-                    if hasattr(item.raw_item.function, 'name'):
-                        tool_name = item.raw_item.function.name
-                    if hasattr(item.raw_item.function, 'arguments'):
-                        try:
-                            arguments = json.loads(item.raw_item.function.arguments) if isinstance(item.raw_item.function.arguments, str) else item.raw_item.function.arguments or {}
-                        except (json.JSONDecodeError, TypeError):
-                            arguments = {"raw_arguments": str(item.raw_item.function.arguments)}
-                elif hasattr(item.raw_item, 'name'):
-                    tool_name = item.raw_item.name
-                    if hasattr(item.raw_item, 'arguments'):
-                        try:
-                            arguments = json.loads(item.raw_item.arguments) if isinstance(item.raw_item.arguments, str) else item.raw_item.arguments or {}
-                        except (json.JSONDecodeError, TypeError):
-                            arguments = {"raw_arguments": str(item.raw_item.arguments)}
-                
-                current_tool_call = {
-                    "tool": tool_name,
-                    "args": arguments,
-                    "call_timestamp": datetime.now().isoformat()
-                }
-                debug_entry["tool_calls"].append(current_tool_call)
-                
-            elif item.type == 'tool_call_output_item':
-                # Extract tool output
-                if current_tool_call:
-                    output_str = ""
-                    if hasattr(item, 'output') and item.output:
-                        output_str = str(item.output)
-                    elif hasattr(item.raw_item, 'output'):
-                        raw_output = item.raw_item['output'] if isinstance(item.raw_item, dict) else item.raw_item.output
-                        output_str = str(raw_output)
-                    
-                    current_tool_call["output"] = output_str
-                    current_tool_call["output_timestamp"] = datetime.now().isoformat()
-                    current_tool_call = None
-        
+            handler = self._ITEM_HANDLERS.get(getattr(item, 'type', None))
+            if handler:
+                handler(debug_entry, item, state)
+
         self.debug_history.append(debug_entry)
+        self._pending_debug.append(debug_entry)
+
+    @staticmethod
+    def _handle_tool_call(debug_entry: Dict[str, Any], item, state: Dict[str, Any]) -> None:
+        """Record a tool call item on the debug entry."""
+        # Single getattr chain instead of nested hasattr probes (each hasattr
+        # is a try/except under the hood)
+        fn = getattr(item.raw_item, 'function', None)
+        if fn is not None:
+            tool_name = getattr(fn, 'name', 'unknown')
+            raw_args = getattr(fn, 'arguments', None)
+        else:
+            tool_name = getattr(item.raw_item, 'name', 'unknown')
+            raw_args = getattr(item.raw_item, 'arguments', None)
+
+        try:
+            arguments = _json_loads(raw_args) if isinstance(raw_args, str) else (raw_args or {})
+        except (ValueError, TypeError):
+            arguments = {"raw_arguments": str(raw_args)}
+
+        current_tool_call = {
+            "tool": tool_name,
+            "args": arguments,
+            "call_timestamp": state["now"]
+        }
+        debug_entry["tool_calls"].append(current_tool_call)
+        state["current"] = current_tool_call
+
+    @staticmethod
+    def _handle_tool_output(debug_entry: Dict[str, Any], item, state: Dict[str, Any]) -> None:
+        """Attach a tool output item to its pending tool call."""
+        current_tool_call = state["current"]
+        if not current_tool_call:
+            return
+
+        output_str = ""
+        if hasattr(item, 'output') and item.output:
+            output_str = str(item.output)
+        elif hasattr(item.raw_item, 'output'):
+            raw_output = item.raw_item['output'] if isinstance(item.raw_item, dict) else item.raw_item.output
+            output_str = str(raw_output)
+
+        current_tool_call["output"] = output_str
+        current_tool_call["output_timestamp"] = state["now"]
+        state["current"] = None
+
+    # Dispatch table keyed on the run-item type string; .__func__ unwraps the
+    # staticmethods so lookups return plain callables
+    _ITEM_HANDLERS = {
+        'tool_call_item': _handle_tool_call.__func__,
+        'tool_call_output_item': _handle_tool_output.__func__,
+    }
     
-    def get_context_summary(self) -> str:
-        """Generate a context summary from recent conversation history."""
-        if not self.history:
-            return ""
-        
-        context_lines = ["## Recent Conversation Context:"]
-        for i, (user_msg, agent_resp) in enumerate(self.history[-5:], 1):
-            context_lines.append(f"**Exchange {i}:**")
-            context_lines.append(f"User: {user_msg[:100]}{'...' if len(user_msg) > 100 else ''}")
-            context_lines.append(f"Assistant: {agent_resp[:100]}{'...' if len(agent_resp) > 100 else ''}")
-            context_lines.append("")
-        
-        return "\n".join(context_lines)
+    def needs_context(self, user_input: str) -> bool:
+        """Decide whether a query plausibly benefits from conversation context.
+
+        Commands and greetings get a shorter prompt (fewer input tokens,
+        lower latency) with no history attached. Anything else keeps its
+        history: short turns are often confirmations or follow-ups that
+        depend on it most.
+        """
+        if user_input.startswith('/'):
+            return False
+        if self._TRIVIAL_INPUT_RE.match(user_input):
+            return False
+        return True
+
+    def get_messages(self) -> List[Dict[str, str]]:
+        """Return conversation history as chat messages for the model input.
+
+        Keeping history out of the system prompt leaves the instructions
+        byte-identical across turns, so provider-side prompt caching can hit
+        the full prefix instead of just the static head.
+
+        Only user and assistant turns are emitted: intermediate tool-call
+        outputs live in debug_history and are never reinjected, so large
+        tool JSON blobs don't inflate input tokens on later turns.
+        """
+        messages: List[Dict[str, str]] = []
+        for exchange in self.history:
+            messages.append({"role": "user", "content": exchange.user})
+            messages.append({"role": "assistant", "content": exchange.assistant})
+        return messages
+
+    def clear(self) -> None:
+        """Clear conversation and debug state."""
+        self.history.clear()
+        self.debug_history.clear()
+        self._size = 0
+        self._pending_history.clear()
+        self._pending_debug.clear()
     
-    def save_history(self, filepath: Optional[str] = None):
-        """Save conversation history to file."""
+    @staticmethod
+    def _append_jsonl(records: List[Dict[str, Any]], filepath: str) -> None:
+        """Append records to a JSON Lines file, preferring orjson when available."""
+        if orjson is not None:
+            data = b''.join(orjson.dumps(record) + b'\n' for record in records)
+        else:
+            # ensure_ascii=False keeps emoji/non-ASCII as UTF-8 instead of
+            # \uXXXX escapes -- faster to encode and ~6x smaller per character
+            data = ''.join(
+                json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+                for record in records
+            ).encode('utf-8')
+        with open(filepath, 'ab') as f:
+            f.write(data)
+
+    async def save_history(self, filepath: Optional[str] = None):
+        """Append conversation history recorded since the last save to file."""
         if not filepath:
-            filepath = f"chat_history_{self.session_id}.json"
-        
-        with open(filepath, 'w') as f:
-            json.dump({
-                'session_id': self.session_id,
-                'timestamp': datetime.now().isoformat(),
-                'history': self.history
-            }, f, indent=2)
-        
+            filepath = f"chat_history_{self.session_id}.jsonl"
+
+        pending, self._pending_history = self._pending_history, []
+        if pending:
+            await asyncio.to_thread(self._append_jsonl, pending, filepath)
+
         print(f"💾 Chat history saved to {filepath}")
-    
-    def save_debug_history(self, filepath: Optional[str] = None):
-        """Save debug history to file."""
+
+    async def save_debug_history(self, filepath: Optional[str] = None):
+        """Append debug history recorded since the last save to file."""
         if not filepath:
-            filepath = f"debug_history_{self.session_id}.json"
-        
-        with open(filepath, 'w') as f:
-            json.dump({
-                'session_id': self.session_id,
-                'timestamp': datetime.now().isoformat(),
-                'debug_history': self.debug_history
-            }, f, indent=2)
-        
+            filepath = f"debug_history_{self.session_id}.jsonl"
+
+        pending, self._pending_debug = self._pending_debug, []
+        if pending:
+            await asyncio.to_thread(self._append_jsonl, pending, filepath)
+
         print(f"🔍 Debug history saved to {filepath}")
 
 
@@ -221,15 +403,55 @@ class ChatExit(Exception):
 class MCPAgentDemo:
     """Main demo class for MCP-enabled OpenAI agent."""
     
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", model_integration=None):
+        # Resolve relative paths against the package directory so the demo
+        # works from any CWD -- and save files still land where the user is
+        if not os.path.isabs(config_path):
+            config_path = str(Path(__file__).parent / config_path)
         self.config_path = config_path
+        self.model_integration = model_integration
+        # Resolve the base prompt once per session; it embeds the session's
+        # start time, so per-turn calls were both redundant and cache-hostile
+        self._base_instructions = get_prompt()
         self.mcp_servers: Sequence[MCPServerStdio] = []
+        # Typed list view handed to Agent(); refreshed whenever mcp_servers
+        # changes so create_agent() doesn't need a per-call cast
+        self._mcp_servers_typed: List[MCPServer] = []
         self.agent: Optional[Agent] = None
         self.chat_session = ChatSession()
         self._shutting_down = False
-    
+        self._cached_agent: Optional[Agent] = None
+        self._agent_instructions_hash: Optional[int] = None
+        self._background_tasks: set = set()
+        self._streamed_last = False
+        self._tools_cache: Optional[str] = None
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
+    # Bound the response cache so a long dev session can't grow it unchecked
+    _RESPONSE_CACHE_SIZE = 256
+
+    def _response_cache_key(self, user_input: str) -> bytes:
+        """Digest of everything that could change the model's answer."""
+        model = self.model_integration.get_model() if self.model_integration else ""
+        history = self.chat_session.get_messages()
+        history_blob = (orjson.dumps(history) if orjson is not None
+                        else json.dumps(history, separators=(',', ':')).encode())
+        return hashlib.blake2b(
+            b"|".join([
+                model.encode(),
+                self._base_instructions.encode(),
+                history_blob,
+                user_input.encode(),
+            ]),
+            digest_size=16,
+        ).digest()
+
     async def load_mcp_servers(self) -> Sequence[MCPServerStdio]:
         """Load and initialize MCP servers from JSON configuration."""
+        # Imported lazily so importing this module doesn't pull in the
+        # whole agents SDK (pydantic, httpx, openai client).
+        from agents.mcp import MCPServerStdio
+
         config_file = Path(self.config_path)
         
         if not config_file.exists():
@@ -237,59 +459,93 @@ class MCPAgentDemo:
             return []
         
         try:
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-            
+            server_specs = self._load_server_params(config_file)
             servers = []
-            mcp_config = config.get('mcpServers', {})
-            
-            print(f"🔧 Loading {len(mcp_config)} MCP servers...")
-            
-            for server_name, server_config in mcp_config.items():
+
+            print(f"🔧 Loading {len(server_specs)} MCP servers...")
+
+            for server_name, server_spec in server_specs:
                 try:
                     print(f"  📡 Initializing {server_name}...")
-                    
-                    # Handle environment variables that contain JSON
-                    server_params: MCPServerStdioParams = {
-                        "command": server_config["command"],
-                        "args": server_config["args"]
-                    }
-                    
-                    if "env" in server_config:
-                        server_params["env"] = {}
-                        for key, value in server_config["env"].items():
-                            # If the value is a JSON string, ensure it's properly escaped
-                            if key == "OPENAPI_MCP_HEADERS" and isinstance(value, str):
-                                try:
-                                    # Parse the JSON string to ensure it's valid
-                                    headers = json.loads(value)
-                                    # Re-encode with proper escaping
-                                    server_params["env"][key] = json.dumps(headers)
-                                except json.JSONDecodeError:
-                                    # If it's not valid JSON, use as is
-                                    server_params["env"][key] = value
-                            else:
-                                server_params["env"][key] = value
-                    
-                    # Create server instance
+
+                    # One fresh instance per session: run()'s AsyncExitStack
+                    # owns connect/cleanup, and MCPServerStdio can't be
+                    # safely re-entered after teardown (or shared by two
+                    # concurrent sessions), so pooling instances across
+                    # runs would reuse dead or contended connections. The
+                    # subprocess dies with the session either way; only
+                    # cache_tools_list survives within one.
                     server = MCPServerStdio(
-                        params=server_params,
+                        params=server_spec.to_params(),
                         cache_tools_list=True
                     )
-                    
+
                     servers.append(server)
                     print(f"  ✅ {server_name} server ready")
-                    
+
                 except Exception as e:
                     print(f"  ❌ Failed to initialize {server_name}: {e}")
                     continue
-            
+
             print(f"🎉 Successfully loaded {len(servers)} MCP servers\n")
             return servers
-            
+
         except Exception as e:
             print(f"❌ Error loading configuration: {e}")
             return []
+
+    # Bump when the cached spec layout changes so stale caches self-invalidate
+    _CACHE_VERSION = 2
+
+    def _load_server_params(self, config_file: Path) -> List[Tuple[str, ServerSpec]]:
+        """Parse server specs from config, caching the processed result on disk.
+
+        The cache lives next to the config file and is keyed on the config's
+        mtime and size, so editing config.json invalidates it automatically.
+        """
+        st = config_file.stat()
+        cache_path = config_file.with_suffix('.json.cache')
+
+        # Fast path: reuse the pre-processed server list from a previous run
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if (cached.get('version') == self._CACHE_VERSION
+                    and cached.get('mtime_ns') == st.st_mtime_ns
+                    and cached.get('size') == st.st_size):
+                return cached['servers']
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            pass
+
+        # Read raw bytes once; both parsers accept bytes, which skips the
+        # text-IO codec and newline-translation layers entirely
+        raw = config_file.read_bytes()
+        config = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+        server_specs: List[Tuple[str, ServerSpec]] = []
+        get_cmd_args = itemgetter("command", "args")
+        for server_name, server_config in config.get('mcpServers', {}).items():
+            command, args = get_cmd_args(server_config)
+            spec = ServerSpec(
+                command=command,
+                args=args,
+                env=_normalize_env(server_config.get("env", {}))
+            )
+            server_specs.append((server_name, spec))
+
+        # Best-effort cache write; a read-only directory just means no cache
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump({
+                    'version': self._CACHE_VERSION,
+                    'mtime_ns': st.st_mtime_ns,
+                    'size': st.st_size,
+                    'servers': server_specs
+                }, f)
+        except OSError:
+            pass
+
+        return server_specs
     
     async def cleanup_servers(self):
         """Cleanup MCP servers properly."""
@@ -298,64 +554,113 @@ class MCPAgentDemo:
             return
             
         print("\n🔧 Cleaning up servers...")
-        for server in self.mcp_servers:
-            try:
-                await server.cleanup()
-            except Exception as e:
-                print(f"❌ Error cleaning up server: {e}")
-        
+        # Tear down concurrently so one misbehaving server can't block the rest
+        results = await asyncio.gather(
+            *(server.cleanup() for server in self.mcp_servers),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"❌ Error cleaning up server: {result}")
+
         self.mcp_servers = []
+        self._mcp_servers_typed = []
         print("✅ Cleanup complete")
     
     async def create_agent(self) -> Agent:
-        """Create the agent with MCP servers and memory context."""
-        
-        # Get the base prompt
-        base_instructions = get_prompt()
-        
-        # Add conversation context if available
-        context_summary = self.chat_session.get_context_summary()
-        if context_summary:
-            instructions = f"{base_instructions}\n\n{context_summary}"
-        else:
-            instructions = base_instructions
-        
+        """Create (or reuse) the agent with MCP servers wired in.
+
+        Instructions stay free of conversation context -- the rolling
+        context travels with the input instead, so the agent rarely needs
+        rebuilding.
+        """
+        from agents import Agent
+
+        # Get the base prompt (resolved once in __init__)
+        instructions = self._base_instructions
+
+        # Reuse the cached agent when the instructions haven't changed --
+        # Agent construction (pydantic validation, schema setup) isn't free
+        instructions_hash = hash(instructions)
+        if self._cached_agent is not None and instructions_hash == self._agent_instructions_hash:
+            return self._cached_agent
+
         # Create agent based on selected model
-        if model_integration:
+        if self.model_integration:
             # Get model configuration from the integration
-            model = model_integration.get_model()
-            
+            model = self.model_integration.get_model()
+
             # Print integration info
-            model_integration.print_integration_info()
+            self.model_integration.print_integration_info()
             
             agent = Agent(
                 name="Test Agent",
                 model=model,
                 instructions=instructions,
-                mcp_servers=cast(List[MCPServer], self.mcp_servers)
+                mcp_servers=self._mcp_servers_typed
             )
         else:
             # This case shouldn't be reached due to earlier validation
             raise RuntimeError("No model integration available!")
-        
+
+        self._cached_agent = agent
+        self._agent_instructions_hash = instructions_hash
         return agent
     
     async def process_user_input(self, user_input: str) -> str:
         """Process user input and return agent response."""
-        
+        self._streamed_last = False
+
         # Handle special commands
         if user_input.startswith('/'):
             return await self.handle_command(user_input)
-        
+
+        # Serve exact repeats from the response cache when enabled -- zero
+        # provider tokens and no MCP round-trips for duplicate dev queries
+        cache_key = None
+        if USE_RESPONSE_CACHE:
+            cache_key = self._response_cache_key(user_input)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                self.chat_session.add_exchange(user_input, cached)
+                return cached
+
+        from agents import Runner
+
         try:
-            # Create agent with current context
-            self.agent = await self.create_agent()
-            
-            # Run the agent
-            result = await Runner.run(self.agent, user_input, max_turns=20)
-            
-            # Extract response
-            response = result.final_output
+            # The agent is built once in run(); this is only a fallback for
+            # library callers that skip run()
+            if self.agent is None:
+                self.agent = await self.create_agent()
+
+            # Attach history as prior messages only when the query warrants
+            # it; message-list input keeps the cached prompt prefix stable
+            if self.chat_session.needs_context(user_input):
+                model_input = self.chat_session.get_messages() + [
+                    {"role": "user", "content": user_input}
+                ]
+            else:
+                model_input = user_input
+
+            from openai.types.responses import ResponseTextDeltaEvent
+
+            # Run the agent, rendering tokens as they arrive so time-to-first-
+            # token is first-chunk latency rather than full-completion latency.
+            # Only output-text deltas are rendered: tool-call argument and
+            # reasoning deltas also carry str payloads but aren't reply text.
+            result = Runner.run_streamed(self.agent, model_input, max_turns=20)
+            chunks: List[str] = []
+            async for event in result.stream_events():
+                if (event.type == 'raw_response_event'
+                        and isinstance(event.data, ResponseTextDeltaEvent)):
+                    sys.stdout.write(event.data.delta)
+                    sys.stdout.flush()
+                    chunks.append(event.data.delta)
+
+            # Extract response (fall back to final_output if nothing streamed)
+            self._streamed_last = bool(chunks)
+            response = "".join(chunks) if chunks else result.final_output
             
             # Print token usage from context wrapper
             usage = result.context_wrapper.usage
@@ -370,7 +675,12 @@ class MCPAgentDemo:
             
             # Add to conversation history
             self.chat_session.add_exchange(user_input, response)
-            
+
+            if cache_key is not None:
+                self._response_cache[cache_key] = response
+                if len(self._response_cache) > self._RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+
             return response
             
         except Exception as e:
@@ -378,90 +688,151 @@ class MCPAgentDemo:
             self.chat_session.add_exchange(user_input, error_msg)
             return error_msg
     
+    async def process_batch(self, prompts: List[str]) -> List[str]:
+        """Run independent prompts concurrently against one agent.
+
+        For scripted sessions the prompts don't depend on each other, so
+        wall time approaches the slowest single run instead of the sum.
+        History and debug records are appended in prompt order afterwards
+        to keep the transcript deterministic.
+        """
+        from agents import Runner
+
+        if self.agent is None:
+            self.agent = await self.create_agent()
+
+        results = await asyncio.gather(
+            *(Runner.run(self.agent, prompt, max_turns=20) for prompt in prompts),
+            return_exceptions=True
+        )
+
+        responses: List[str] = []
+        for prompt, result in zip(prompts, results):
+            if isinstance(result, Exception):
+                response = f"❌ Error processing request: {result}"
+            else:
+                response = result.final_output
+                self.chat_session.add_debug_info(result)
+            self.chat_session.add_exchange(prompt, response)
+            responses.append(response)
+        return responses
+
+    async def _warm_cache(self) -> None:
+        """Keep server tool lists warm while the user is typing.
+
+        With cache_tools_list=True this is a no-op round-trip after the
+        first call, but it keeps the stdio pipes active and repopulates
+        the cache if a server was restarted between turns.
+        """
+        if not self.mcp_servers:
+            return
+        await asyncio.gather(
+            *(server.list_tools() for server in self.mcp_servers),
+            return_exceptions=True
+        )
+
+    def _spawn_background(self, coro) -> None:
+        """Run a coroutine in the background, keeping a strong reference."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     async def handle_command(self, command: str) -> str:
         """Handle special chat commands."""
-        cmd = command.lower().strip()
-        
-        if cmd == '/help':
-            provider_status = "🚀 Amazon Nova (AWS Bedrock)" if USE_NOVA else "🤖 OpenAI"
-            return f"""
-🤖 **Available Commands:**
-• `/help` - Show this help message
-• `/clear` - Clear conversation history
-• `/history` - Show recent conversation history
-• `/save` - Save conversation to file
-• `/debug` - Save debug information (tool calls, usage) to file
-• `/tools` - List available MCP tools
-• `/quit` or `/exit` - Exit the chat
-• Any other message - Chat with the assistant
-
-**Current Provider:** {provider_status}
-**💡 Tip:** Change USE_NOVA flag in demo.py to switch providers
-            """.strip()
-        
-        elif cmd == '/clear':
-            self.chat_session.history.clear()
-            self.chat_session.debug_history.clear()
-            return "🧹 Conversation and debug history cleared!"
-        
-        elif cmd == '/history':
-            if not self.chat_session.history:
-                return "📝 No conversation history yet."
-            
-            history_text = ["📝 **Recent Conversation History:**\n"]
-            for i, (user_msg, agent_resp) in enumerate(self.chat_session.history, 1):
-                history_text.append(f"**{i}. User:** {user_msg}")
-                history_text.append(f"**Assistant:** {agent_resp[:200]}{'...' if len(agent_resp) > 200 else ''}\n")
-            
-            return "\n".join(history_text)
-        
-        elif cmd == '/save':
-            self.chat_session.save_history()
-            return "💾 Conversation history saved!"
-        
-        elif cmd == '/debug':
-            self.chat_session.save_debug_history()
-            return "🔍 Debug history saved!"
-        
-        elif cmd == '/tools':
-            if not self.mcp_servers:
-                return "🔧 No MCP servers loaded."
-            
-            tools_info = ["🛠️ **Available MCP Tools:**\n"]
-            for i, server in enumerate(self.mcp_servers, 1):
-                try:
-                    # This would require the server to be started
-                    tools_info.append(f"{i}. MCP Server (tools available when running)")
-                except:
-                    tools_info.append(f"{i}. MCP Server (unable to list tools)")
-            
-            return "\n".join(tools_info)
-        
-        elif cmd in ['/quit', '/exit']:
-            if not self._shutting_down:
-                self._shutting_down = True
-                print("👋 Goodbye! Have a great day!")
-                response = "Exiting chat..."
-                raise ChatExit(response)
-            return "Already shutting down..."
-        
-        else:
+        # Dispatch on the first token so trailing text doesn't miss the table
+        cmd = command.strip().lower().split()[0]
+        handler = self._COMMANDS.get(cmd)
+        if handler is None:
             return f"❓ Unknown command: {command}. Type `/help` for available commands."
+        return await handler(self)
+
+    async def _cmd_help(self) -> str:
+        return _HELP_TEXT
+
+    async def _cmd_clear(self) -> str:
+        self.chat_session.clear()
+        return "🧹 Conversation and debug history cleared!"
+
+    async def _cmd_history(self) -> str:
+        if not self.chat_session.history:
+            return "📝 No conversation history yet."
+
+        history_text = ["📝 **Recent Conversation History:**\n"]
+        for i, exchange in enumerate(self.chat_session.history, 1):
+            history_text.append(f"**{i}. User:** {exchange.user}")
+            history_text.append(f"**Assistant:** {_ellipsize(exchange.assistant, 200)}\n")
+
+        return "\n".join(history_text)
+
+    async def _cmd_save(self) -> str:
+        self._spawn_background(self.chat_session.save_history())
+        return "💾 Conversation history saved!"
+
+    async def _cmd_debug(self) -> str:
+        self._spawn_background(self.chat_session.save_debug_history())
+        return "🔍 Debug history saved!"
+
+    async def _cmd_tools(self) -> str:
+        # Tool lists are stable for the session, so the catalog is rendered
+        # once at startup and repeated /tools invocations are free
+        return self._tools_cache or "🔧 No MCP servers loaded."
+
+    async def _build_tools_cache(self) -> None:
+        """Fetch and render the MCP tool catalog once after servers start."""
+        if not self.mcp_servers:
+            return
+
+        # Fetch every server's tool list in parallel -- same sum-to-max
+        # collapse as server startup
+        results = await asyncio.gather(
+            *(server.list_tools() for server in self.mcp_servers),
+            return_exceptions=True
+        )
+
+        tools_info = ["🛠️ **Available MCP Tools:**\n"]
+        for i, tools in enumerate(results, 1):
+            if isinstance(tools, Exception):
+                tools_info.append(f"{i}. MCP Server (unable to list tools: {tools})")
+            else:
+                names = ", ".join(tool.name for tool in tools) or "(no tools)"
+                tools_info.append(f"{i}. {names}")
+
+        self._tools_cache = "\n".join(tools_info)
+
+    async def _cmd_quit(self) -> str:
+        if not self._shutting_down:
+            self._shutting_down = True
+            print("👋 Goodbye! Have a great day!")
+            response = "Exiting chat..."
+            raise ChatExit(response)
+        return "Already shutting down..."
+
+    # O(1) command dispatch; values are the unbound handler functions
+    _COMMANDS = {
+        '/help': _cmd_help,
+        '/clear': _cmd_clear,
+        '/history': _cmd_history,
+        '/save': _cmd_save,
+        '/debug': _cmd_debug,
+        '/tools': _cmd_tools,
+        '/quit': _cmd_quit,
+        '/exit': _cmd_quit,
+    }
     
     def print_welcome(self):
         """Print welcome message and status."""
         provider_info = "🤖 Amazon Nova (AWS Bedrock)" if USE_NOVA else "🤖 OpenAI"
         model_info = "amazon.nova-lite-v1:0" if USE_NOVA else "gpt-4o-mini"
-        
-        print("🚀 AI Agent with MCP Tools - Interactive Chat")
-        print("=" * 55)
-        print(f"📂 Config: {self.config_path}")
-        print(f"🔗 MCP Servers: {len(self.mcp_servers)} loaded")
-        print(f"🧠 Memory: {self.chat_session.max_history} exchanges")
-        print(f"{provider_info} | Model: {model_info}")
-        print("\n💡 Type '/help' for commands or just start chatting!")
-        print("🎯 Example: 'List files in current directory' or 'What's the current time?'")
-        print("-" * 55)
+
+        print(_WELCOME_TEMPLATE.format(
+            rule="=" * 55,
+            config=self.config_path,
+            n_servers=len(self.mcp_servers),
+            max_history=self.chat_session.max_history,
+            provider=provider_info,
+            model=model_info,
+            dash_rule="-" * 55
+        ))
     
     async def interactive_chat(self):
         """Main interactive chat loop."""
@@ -469,19 +840,26 @@ class MCPAgentDemo:
         
         while True:
             try:
-                # Get user input
-                user_input = input("\n🗣️  You: ").strip()
+                # Get user input off-loop so background tasks keep running
+                # while we wait for the user to hit Enter; warm the tool
+                # caches in that idle window
+                self._spawn_background(self._warm_cache())
+                user_input = (await asyncio.to_thread(input, "\n🗣️  You: ")).strip()
                 
                 if not user_input:
                     continue
                 
                 print("🤔 Thinking...")
-                
-                # Process input and get response
+
+                # Print the prefix up front; the response streams in after it
+                print("🤖 Assistant: ", end="", flush=True)
                 response = await self.process_user_input(user_input)
-                
-                # Display response
-                print(f"🤖 Assistant: {response}")
+
+                # Streamed responses are already on screen; just end the line
+                if self._streamed_last:
+                    print()
+                else:
+                    print(response)
                 
             except ChatExit as e:
                 # Save conversation before exit
@@ -502,35 +880,110 @@ class MCPAgentDemo:
                     break
                 continue
     
-    async def run(self):
-        """Initialize and run the demo."""
+    def _setup_shared_http_client(self):
+        """Pin one keep-alive HTTP client for all OpenAI calls.
+
+        Connection reuse skips the TCP+TLS handshake on every turn. Best
+        effort: litellm-backed models manage their own session, and without
+        an OPENAI_API_KEY the default client can't be constructed at all.
+        """
+        try:
+            import httpx
+            from agents import set_default_openai_client
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+            )
+            set_default_openai_client(AsyncOpenAI(http_client=http_client))
+            return http_client
+        except Exception:
+            return None
+
+    async def run(self, batch_prompts: Optional[List[str]] = None):
+        """Initialize and run the demo.
+
+        With batch_prompts, runs them concurrently and prints the answers
+        instead of entering the interactive loop.
+        """
         # Load MCP server configurations
         self.mcp_servers = await self.load_mcp_servers()
-        
+        self._mcp_servers_typed = list(self.mcp_servers)
+
         # Use async context managers to properly handle server lifecycles
         async with AsyncExitStack() as stack:
-            # Enter each server's context
-            for server in self.mcp_servers:
-                await stack.enter_async_context(server)
+            http_client = self._setup_shared_http_client()
+            if http_client is not None:
+                stack.push_async_callback(http_client.aclose)
+
+            # Enter all server contexts concurrently -- each handshake is
+            # dominated by subprocess spawn + stdio round-trip latency
+            if hasattr(asyncio, "TaskGroup"):
+                # Structured concurrency (3.11+): a failed handshake cancels
+                # its siblings instead of leaving orphan subprocesses
+                async with asyncio.TaskGroup() as tg:
+                    for server in self.mcp_servers:
+                        tg.create_task(stack.enter_async_context(server))
+            else:
+                await asyncio.gather(
+                    *(stack.enter_async_context(server) for server in self.mcp_servers)
+                )
+
+            # Servers are live; snapshot the tool catalog for /tools
+            await self._build_tools_cache()
+
+            # Build the agent once for the whole session
+            self.agent = await self.create_agent()
             
             try:
-                await self.interactive_chat()
+                if batch_prompts is not None:
+                    responses = await self.process_batch(batch_prompts)
+                    for prompt, response in zip(batch_prompts, responses):
+                        print(f"\n🗣️  You: {prompt}")
+                        print(f"🤖 Assistant: {response}")
+                else:
+                    await self.interactive_chat()
             except Exception as e:
                 if not isinstance(e, ChatExit):
                     print(f"\n💥 Unexpected error during chat: {e}")
                 # Let the async context manager handle cleanup
+            finally:
+                # Drain fire-and-forget work (e.g. /save flushes) before the
+                # stack unwinds; otherwise asyncio.run cancels the pending
+                # tasks and records the user was told were saved are lost
+                if self._background_tasks:
+                    await asyncio.gather(
+                        *self._background_tasks, return_exceptions=True
+                    )
 
 
 async def main():
     """Main entry point."""
-    # Change to script directory to find config.json
-    script_dir = Path(__file__).parent
-    os.chdir(script_dir)
-    
-    demo = MCPAgentDemo()
-    
+    # Load environment variables from .env file before validating credentials
+    load_dotenv()
+
+    model_integration = validate_model_setup()
+    if model_integration is None:
+        sys.exit(1)
+
+    # Non-interactive mode: --batch-file runs one prompt per line, concurrently
+    batch_prompts = None
+    if "--batch-file" in sys.argv:
+        path_index = sys.argv.index("--batch-file") + 1
+        if path_index >= len(sys.argv):
+            print("❌ --batch-file requires a path argument")
+            sys.exit(1)
+        try:
+            with open(sys.argv[path_index], encoding="utf-8") as f:
+                batch_prompts = [line.strip() for line in f if line.strip()]
+        except OSError as e:
+            print(f"❌ Could not read batch file: {e}")
+            sys.exit(1)
+
+    demo = MCPAgentDemo(model_integration=model_integration)
+
     try:
-        await demo.run()
+        await demo.run(batch_prompts=batch_prompts)
     except (KeyboardInterrupt, EOFError):
         print("\n👋 Demo stopped by user")
     except Exception as e:
@@ -540,4 +993,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # Fall back to the default selector event loop
+    asyncio.run(main())
\ No newline at end of file
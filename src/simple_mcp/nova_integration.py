@@ -30,12 +30,14 @@ def validate_nova_setup() -> Tuple[bool, Optional[Any]]:
 
 class NovaIntegration:
     """Handles Nova model integration via LiteLLM."""
-    
+
+    # Shared across instances; the string is allocated once at class creation
+    model_name = "amazon.nova-lite-v1:0"
+
     def __init__(self):
         self.access_key = os.getenv("AWS_ACCESS_KEY_ID")
         self.secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
         self.region = os.getenv("AWS_REGION_NAME")
-        self.model_name = "amazon.nova-lite-v1:0"
     
     def get_model(self) -> str:
         """
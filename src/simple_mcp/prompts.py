@@ -2,22 +2,62 @@
 Module containing system prompts and prompt generation logic for the MCP agents.
 """
 
-import os
-from typing import Optional
+import sys
+import time
+from typing import Optional, Tuple
 from datetime import datetime
 
+# Static halves of the agent prompt, built once at import; only the
+# timestamp between them varies per call
+_PROMPT_PREFIX = '''You are an agent designed to help the user with their query, please answer according to the following instructions:
+
+Current Date and Time: '''
+
+_PROMPT_SUFFIX = '''
+
+
+'''
+
+# Interned so downstream cache keys and equality checks on the constants
+# short-circuit on identity instead of comparing bytes
+_PROMPT_PREFIX = sys.intern(_PROMPT_PREFIX)
+_PROMPT_SUFFIX = sys.intern(_PROMPT_SUFFIX)
+
+# Pre-encoded halves for callers that write the prompt straight into an
+# HTTP body; only the timestamp is encoded per call
+_PROMPT_PREFIX_B = _PROMPT_PREFIX.encode('utf-8')
+_PROMPT_SUFFIX_B = _PROMPT_SUFFIX.encode('utf-8')
+
+# One-entry cache for the formatted timestamp; the prompt only shows
+# second precision, so calls within the same second skip strftime
+_ts_cache: Optional[Tuple[int, str]] = None
+
+def _current_time_str() -> str:
+    global _ts_cache
+    now = int(time.time())
+    if _ts_cache is not None and _ts_cache[0] == now:
+        return _ts_cache[1]
+    formatted = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+    _ts_cache = (now, formatted)
+    return formatted
+
 def get_prompt() -> str:
     """
     Generate a prompt for the agent to use.
-    
+
     Returns:
         str: The complete system prompt with all variables substituted.
     """
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    return f'''You are an agent designed to help the user with their query, please answer according to the following instructions:
+    return _PROMPT_PREFIX + _current_time_str() + _PROMPT_SUFFIX
 
-Current Date and Time: {current_time}
+def get_prompt_bytes() -> bytes:
+    """
+    Generate the agent prompt as UTF-8 bytes.
 
+    Skips re-encoding the invariant text for callers that stream the
+    prompt directly into a request body.
 
-'''
+    Returns:
+        bytes: The complete system prompt, UTF-8 encoded.
+    """
+    return b"".join((_PROMPT_PREFIX_B, _current_time_str().encode('utf-8'), _PROMPT_SUFFIX_B))